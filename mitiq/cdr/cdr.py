@@ -107,8 +107,9 @@ def execute_with_cdr(
     method_replace = kwargs.get("method_replace", "closest")
     random_state = kwargs.get("random_state", None)
     kwargs_for_training_set_generation = {
-        "sigma_select": kwargs.get("sigma_select"),
-        "sigma_replace": kwargs.get("sigma_replace"),
+        key: kwargs[key]
+        for key in ("sigma_select", "sigma_replace")
+        if kwargs.get(key) is not None
     }
 
     if num_fit_parameters is None:
@@ -140,7 +141,7 @@ def execute_with_cdr(
         method_select,
         method_replace,
         random_state,
-        kwargs=kwargs_for_training_set_generation,
+        **kwargs_for_training_set_generation,
     )
 
     # [Optionally] Scale noise in circuits.
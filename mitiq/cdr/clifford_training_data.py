@@ -14,9 +14,10 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 """Functions for mapping circuits to (near) Clifford circuits."""
-from typing import List, Optional, Sequence, Union, Any, cast
+from typing import Dict, List, Optional, Sequence, Union, Any, cast
 
 import numpy as np
+import numpy.typing as npt
 
 import cirq
 from cirq.circuits import Circuit
@@ -27,8 +28,14 @@ from mitiq.cdr.clifford_utils import (
     closest_clifford,
     random_clifford,
     probabilistic_angle_to_clifford,
+    _is_equidistant,
+    _split_clifford_angles,
+    _CLIFFORD_ANGLES,
 )
 
+# Rz gates with Clifford angles, in the same order as _CLIFFORD_ANGLES.
+_CLIFFORD_RZ_GATES = [cirq.ops.rz(angle) for angle in _CLIFFORD_ANGLES]
+
 
 @atomic_one_to_many_converter
 def generate_training_circuits(
@@ -71,21 +78,31 @@ def generate_training_circuits(
         random_state = np.random.RandomState(random_state)
 
     # Find the non-Clifford operations in the circuit.
-    operations = np.array(list(circuit.all_operations()))
-    non_clifford_indices_and_ops = np.array(
-        [
-            [i, op]
-            for i, op in enumerate(operations)
-            if not cirq.has_stabilizer_effect(op)
-        ]
+    operations = list(circuit.all_operations())
+    is_non_clifford = np.fromiter(
+        (not cirq.has_stabilizer_effect(op) for op in operations),
+        dtype=bool,
+        count=len(operations),
     )
+    non_clifford_indices = np.flatnonzero(is_non_clifford)
 
-    if len(non_clifford_indices_and_ops) == 0:
+    if len(non_clifford_indices) == 0:
         return [circuit] * num_training_circuits
 
-    non_clifford_indices = np.int32(non_clifford_indices_and_ops[:, 0])
-    non_clifford_ops = cast(
-        List[cirq.ops.Operation], non_clifford_indices_and_ops[:, 1]
+    non_clifford_ops = [operations[i] for i in non_clifford_indices]
+
+    sigma_select: float = kwargs.get("sigma_select", 0.5)
+    sigma_replace: float = kwargs.get("sigma_replace", 0.5)
+
+    # The selection distribution is the same for every training circuit.
+    selection_distribution = _get_selection_distribution(
+        non_clifford_ops, method_select, sigma_select
+    )
+
+    # Closest Clifford replacements do not change between training circuits,
+    # so they are cached as they are computed.
+    closest_clifford_cache: Optional[Dict[int, cirq.ops.Operation]] = (
+        {} if method_replace == "closest" else None
     )
 
     # Replace (some of) the non-Clifford operations.
@@ -97,9 +114,13 @@ def generate_training_circuits(
             method_select,
             method_replace,
             random_state,
-            **kwargs,
+            sigma_select,
+            sigma_replace,
+            selection_distribution,
+            closest_clifford_cache,
         )
-        operations[non_clifford_indices] = new_ops
+        for i, op in zip(non_clifford_indices, new_ops):
+            operations[i] = op
         near_clifford_circuits.append(Circuit(operations))
 
     return near_clifford_circuits
@@ -111,7 +132,10 @@ def _map_to_near_clifford(
     method_select: str = "uniform",
     method_replace: str = "closest",
     random_state: Optional[np.random.RandomState] = None,
-    **kwargs: Any,
+    sigma_select: float = 0.5,
+    sigma_replace: float = 0.5,
+    selection_distribution: Optional[npt.NDArray[np.float64]] = None,
+    closest_clifford_cache: Optional[Dict[int, cirq.ops.Operation]] = None,
 ) -> Sequence[cirq.ops.Operation]:
     """Returns the list of non-Clifford operations with some of these replaced
     by Clifford operations.
@@ -126,14 +150,23 @@ def _map_to_near_clifford(
             replaced by Clifford gates. Options are 'uniform', 'gaussian' or
             'closest'.
         random_state: Seed for sampling.
-        kwargs: Additional options for selection / replacement methods.
-            sigma_select (float): Width of the Gaussian distribution used for
-                ``method_select='gaussian'``.
-            sigma_replace (float): Width of the Gaussian distribution used for
-                ``method_replace='gaussian'``.
+        sigma_select: Width of the Gaussian distribution used for
+            ``method_select='gaussian'``.
+        sigma_replace: Width of the Gaussian distribution used for
+            ``method_replace='gaussian'``.
+        selection_distribution: Precomputed probabilities of selecting each
+            non-Clifford operation. If None, they are computed from
+            ``method_select``.
+        closest_clifford_cache: Closest Clifford replacements of non-Clifford
+            operations, keyed by their index, which is read and extended. Only
+            valid for ``method_replace='closest'``.
     """
-    sigma_select: float = kwargs.get("sigma_select", 0.5)
-    sigma_replace: float = kwargs.get("sigma_replace", 0.5)
+    if closest_clifford_cache is not None and method_replace != "closest":
+        raise ValueError(
+            "Arg `closest_clifford_cache` can only be used with "
+            f"`method_replace='closest'` but `method_replace` was "
+            f"{method_replace}."
+        )
 
     # Select (indices of) operations to replace.
     indices_of_selected_ops = _select(
@@ -142,31 +175,69 @@ def _map_to_near_clifford(
         method_select,
         sigma_select,
         random_state,
+        selection_distribution,
     )
 
     # Replace selected operations.
-    clifford_ops: Sequence[cirq.ops.Operation] = _replace(
-        [non_clifford_ops[i] for i in indices_of_selected_ops],
-        method_replace,
-        sigma_replace,
-        random_state,
-    )
+    clifford_ops: Sequence[cirq.ops.Operation]
+    if closest_clifford_cache is None:
+        clifford_ops = _replace(
+            [non_clifford_ops[i] for i in indices_of_selected_ops],
+            method_replace,
+            sigma_replace,
+            random_state,
+        )
+    else:
+        clifford_ops = _replace_closest_cached(
+            non_clifford_ops, indices_of_selected_ops, closest_clifford_cache
+        )
 
     # Return sequence of (near) Clifford operations.
-    return [
-        cast(List[cirq.ops.Operation], clifford_ops).pop(0)
-        if i in indices_of_selected_ops
-        else op
-        for (i, op) in enumerate(non_clifford_ops)
-    ]
+    near_clifford_ops = list(non_clifford_ops)
+    for i, clifford_op in zip(indices_of_selected_ops, clifford_ops):
+        near_clifford_ops[i] = clifford_op
+    return near_clifford_ops
+
+
+def _replace_closest_cached(
+    non_clifford_ops: Sequence[cirq.ops.Operation],
+    indices: Sequence[int],
+    cache: Dict[int, cirq.ops.Operation],
+) -> List[cirq.ops.Operation]:
+    """Returns the closest Clifford replacements of the non-Clifford
+    operations at the given indices, computing only those missing from the
+    cache.
+
+    Args:
+        non_clifford_ops: Sequence of non-Clifford operations.
+        indices: Indices of the operations to replace.
+        cache: Closest Clifford replacements keyed by index. Replacements of
+            angles equidistant from two Clifford angles are drawn at random,
+            so they are recomputed every time and never cached.
+    """
+    missing_indices = [i for i in indices if i not in cache]
+    new_ops: Dict[int, cirq.ops.Operation] = {}
+    if missing_indices:
+        missing_ops = [non_clifford_ops[i] for i in missing_indices]
+        new_ops = dict(zip(missing_indices, _replace(missing_ops, "closest")))
+
+        _, fractions = _split_clifford_angles(
+            [op.gate.exponent * np.pi for op in missing_ops]  # type: ignore
+        )
+        for i, is_tie in zip(missing_indices, _is_equidistant(fractions)):
+            if not is_tie:
+                cache[i] = new_ops[i]
+
+    return [new_ops[i] if i in new_ops else cache[i] for i in indices]
 
 
 def _select(
     non_clifford_ops: Sequence[cirq.ops.Operation],
     fraction_non_clifford: float,
     method: str = "uniform",
-    sigma: Optional[float] = 1.0,
+    sigma: float = 1.0,
     random_state: Optional[np.random.RandomState] = None,
+    distribution: Optional[npt.NDArray[np.float64]] = None,
 ) -> List[int]:
     """Returns indices of non-Clifford operations selected (to be replaced)
     according to some method.
@@ -180,6 +251,8 @@ def _select(
                       of non-Clifford gates to replace, only has effect if
                       method_select = 'gaussian'.
         random_state: Random state for sampling.
+        distribution: Precomputed probabilities of selecting each operation.
+            If None, they are computed according to ``method``.
     """
     if random_state is None:
         random_state = np.random  # type: ignore
@@ -188,8 +261,45 @@ def _select(
     num_to_replace = int(round(fraction_non_clifford * num_non_cliff))
 
     # Get the distribution for how to select operations.
+    if distribution is None:
+        distribution = _get_selection_distribution(
+            non_clifford_ops, method, sigma
+        )
+
+    # Select (indices of) non-Clifford operations to replace.
+    selected_indices = cast(np.random.RandomState, random_state).choice(
+        num_non_cliff,
+        num_non_cliff - num_to_replace,
+        replace=False,
+        p=distribution,
+    )
+    # Scatter into a mask to get the indices in increasing order without a
+    # comparison sort.
+    is_selected = np.zeros(num_non_cliff, dtype=bool)
+    is_selected[selected_indices] = True
+    return np.flatnonzero(is_selected).tolist()
+
+
+def _get_selection_distribution(
+    non_clifford_ops: Sequence[cirq.ops.Operation],
+    method: str = "uniform",
+    sigma: float = 1.0,
+) -> npt.NDArray[np.float64]:
+    """Returns the probabilities with which each non-Clifford operation is
+    selected (to be replaced) according to some method.
+
+    Args:
+        non_clifford_ops: Sequence of non-Clifford operations.
+        method: {'uniform', 'gaussian'} method to use to select Clifford gates
+                to replace.
+        sigma: width of probability distribution used in selection
+                      of non-Clifford gates to replace, only has effect if
+                      method_select = 'gaussian'.
+    """
+    num_non_cliff = len(non_clifford_ops)
+
     if method == "uniform":
-        distribution = 1.0 / num_non_cliff * np.ones(shape=(num_non_cliff,))
+        return 1.0 / num_non_cliff * np.ones(shape=(num_non_cliff,))
     elif method == "gaussian":
         non_clifford_angles = np.array(
             [
@@ -198,22 +308,13 @@ def _select(
             ]
         )
         probabilities = angle_to_proximity(non_clifford_angles, sigma)
-        distribution = probabilities / sum(probabilities)
+        return probabilities / np.sum(probabilities)
     else:
         raise ValueError(
             f"Arg `method_select` must be 'uniform' or 'gaussian' but was "
             f"{method}."
         )
 
-    # Select (indices of) non-Clifford operations to replace.
-    selected_indices = cast(np.random.RandomState, random_state).choice(
-        range(num_non_cliff),
-        num_non_cliff - num_to_replace,
-        replace=False,
-        p=distribution,
-    )
-    return [int(i) for i in sorted(selected_indices)]
-
 
 def _replace(
     non_clifford_ops: Sequence[cirq.ops.Operation],
@@ -259,7 +360,9 @@ def _replace(
 
     elif method == "gaussian":
         clifford_angles = probabilistic_angle_to_clifford(
-            non_clifford_angles, sigma, random_state
+            non_clifford_angles,
+            sigma,
+            cast(np.random.RandomState, random_state),
         )
 
     else:
@@ -268,11 +371,9 @@ def _replace(
             f" but was {method}."
         )
 
-    # TODO: Write function to replace the angles in a list of operations?
+    # Look up the prebuilt Rz gate of each Clifford angle.
+    clifford_indices = np.rint(clifford_angles / (np.pi / 2)).astype(int) % 4
     return [
-        cirq.ops.rz(a).on(*q)
-        for (a, q) in zip(
-            clifford_angles,
-            [op.qubits for op in non_clifford_ops],
-        )
+        _CLIFFORD_RZ_GATES[index].on(*op.qubits)
+        for (index, op) in zip(clifford_indices, non_clifford_ops)
     ]
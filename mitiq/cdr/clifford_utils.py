@@ -14,7 +14,7 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 """Functions for mapping circuits to (near) Clifford circuits."""
-from typing import List
+from typing import Tuple
 
 import numpy as np
 import numpy.typing as npt
@@ -26,7 +26,7 @@ from mitiq.interface import accept_any_qprogram_as_input
 
 # Z gates with these angles/exponents are Clifford gates.
 _CLIFFORD_EXPONENTS = np.array([0.0, 0.5, 1.0, 1.5])
-_CLIFFORD_ANGLES = [exponent * np.pi for exponent in _CLIFFORD_EXPONENTS]
+_CLIFFORD_ANGLES = _CLIFFORD_EXPONENTS * np.pi
 
 
 @accept_any_qprogram_as_input
@@ -63,100 +63,126 @@ def random_clifford(
         num_angles: Number of Clifford angles to return in array.
         random_state: Random state for sampling.
     """
-    return np.array(
-        [random_state.choice(_CLIFFORD_ANGLES) for _ in range(num_angles)]
-    )
+    return _CLIFFORD_ANGLES[random_state.randint(4, size=num_angles)]
+
+
+def _split_clifford_angles(
+    angles: npt.ArrayLike,
+) -> Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """Returns the index of the Clifford angle at or just below each angle
+    (modulo 2 pi), and the remaining fraction of pi / 2 above it.
+
+    Args:
+        angles: Rotation angles.
+    """
+    ang_scaled = np.mod(np.atleast_1d(angles), 2 * np.pi)
+    ang_scaled /= np.pi / 2
+    lower_indices = np.floor(ang_scaled)
+    ang_scaled -= lower_indices
+    return lower_indices, ang_scaled
+
+
+def _is_equidistant(
+    fractions: npt.NDArray[np.float64],
+) -> npt.NDArray[np.bool_]:
+    """Returns True for angles equidistant from two Clifford angles.
+
+    Args:
+        fractions: Fractions of pi / 2 above the Clifford angle below, as
+            returned by ``_split_clifford_angles``.
+    """
+    return np.abs(2 * fractions - 1) < 10 ** (-6)
 
 
-@np.vectorize
-def closest_clifford(angles: npt.NDArray[np.float64]) -> float:
+def closest_clifford(
+    angles: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
     """Returns the nearest Clifford angles to the input angles.
 
     Args:
-        non_Clifford_ops: Non-Clifford opperations.
+        angles: Non-Clifford angles.
     """
-    ang_scaled = angles / (np.pi / 2)
-    # if just one min value, return the corresponding nearest cliff.
-    if (
-        abs((ang_scaled / 0.5) - 1) > 10 ** (-6)
-        and abs((ang_scaled / 0.5) - 3) > 10 ** (-6)
-        and (abs((ang_scaled / 0.5) - 5) > 10 ** (-6))
-    ):
-        index = int(np.round(ang_scaled)) % 4
-        return _CLIFFORD_ANGLES[index]
+    indices, fractions = _split_clifford_angles(angles)
+    round_up = fractions > 0.5
     # If equidistant between two Clifford angles, randomly choose one.
-    else:
-        index_list = [ang_scaled - 0.5, ang_scaled + 0.5]
-        index = int(np.random.choice(index_list))
-        return _CLIFFORD_ANGLES[index]
+    ties = _is_equidistant(fractions)
+    if ties.any():
+        round_up[ties] = np.random.randint(0, 2, size=np.count_nonzero(ties))
+    indices += round_up
+    clifford_angles = _CLIFFORD_ANGLES[indices.astype(int) % 4]
+    return clifford_angles.reshape(np.shape(angles))
 
 
-@np.vectorize
 def is_clifford_angle(
     angles: npt.NDArray[np.float64],
     tol: float = 10**-5,
-) -> bool:
+) -> npt.NDArray[np.bool_]:
     """Function to check if a given angle is Clifford.
 
     Args:
         angles: rotation angle in the Rz gate.
+        tol: Tolerance on the distance to the nearest Clifford angle.
     """
-    angles = angles % (2 * np.pi)
-    closest_clifford_angle = closest_clifford(angles)
-    if abs(closest_clifford_angle - angles) < tol:
-        return True
-    return False
+    _, fractions = _split_clifford_angles(angles)
+    # The nearest Clifford angle may be the one above, which for angles just
+    # below 2 pi is 2 pi itself.
+    distances = np.minimum(fractions, 1 - fractions) * (np.pi / 2)
+    return (distances < tol).reshape(np.shape(angles))
 
 
-@np.vectorize
-def angle_to_proximities(angle: float, sigma: float) -> List[float]:
+def angle_to_proximities(
+    angle: npt.ArrayLike, sigma: float
+) -> npt.NDArray[np.float64]:
     """Returns probability distribution based on distance from angles to
     Clifford gates.
 
     Args:
-        angle: angle to form probability distribution.
+        angle: angle(s) to form probability distribution.
+        sigma: Width of probability distribution.
 
     Returns:
         discrete value of probability distribution calculated from
         exp(-(diff/sigma)^2) where diff is the distance from each angle and the
-        Clifford gates.
+        Clifford gates. The last axis runs over the Clifford angles.
     """
-    s_matrix = cirq.unitary(cirq.S)
-    rz_matrix = cirq.unitary(cirq.rz(angle % (2 * np.pi)))
-    # TODO: Update loop / if.
-    dists = []
-    for exponent in range(4):
-        if exponent == 0:
-            exponent = 4
-        diff = np.linalg.norm(rz_matrix - s_matrix**exponent)
-        dists.append(np.exp(-((diff / sigma) ** 2)))
-    return dists
-
-
-@np.vectorize
-def angle_to_proximity(angle: float, sigma: float) -> float:
+    half_angles = np.expand_dims(np.mod(angle, 2 * np.pi), -1)
+    half_angles /= 2
+    # The Frobenius distance between Rz(angle) = diag(exp(-i angle / 2),
+    # exp(i angle / 2)) and S^k = diag(1, i^k) satisfies
+    # diff^2 = 4 - 2 cos(angle / 2) - 2 cos(angle / 2 - k pi / 2).
+    # The exponent -(diff / sigma)^2 is accumulated in a single buffer.
+    exponents = np.subtract(half_angles, _CLIFFORD_ANGLES)
+    np.cos(exponents, out=exponents)
+    exponents += np.cos(half_angles)
+    exponents -= 2
+    exponents *= 2 / sigma**2
+    return np.exp(exponents, out=exponents)
+
+
+def angle_to_proximity(
+    angle: npt.ArrayLike, sigma: float
+) -> npt.NDArray[np.float64]:
     """Returns probability distribution based on distance from angles to
     Clifford gates.
 
     Args:
-        angle: angle to form probability distribution.
+        angle: angle(s) to form probability distribution.
+        sigma: Width of probability distribution.
 
     Returns:
         discrete value of probability distribution calculated from
-        exp(-(dist/sigma)^2) where dist = sum(dists) is the
-        sum of distances from each Clifford gate.
+        exp(-(dist/sigma)^2) where dist is the distance from the closest
+        Clifford gate.
     """
-    dists = angle_to_proximities(angle, sigma)
-    return np.max(dists)
+    return np.max(angle_to_proximities(angle, sigma), axis=-1)
 
 
-@np.vectorize
 def probabilistic_angle_to_clifford(
-    angles: float,
+    angles: npt.ArrayLike,
     sigma: float,
     random_state: np.random.RandomState,
 ) -> npt.NDArray[np.float64]:
-    """Returns a Clifford angle sampled from the distribution
+    """Returns Clifford angles sampled from the distribution
 
                         prob = exp(-(dist/sigma)^2)
 
@@ -166,11 +192,21 @@ def probabilistic_angle_to_clifford(
     Args:
         angles: Non-Clifford angles.
         sigma: Width of probability distribution.
-    """
+        random_state: Random state for sampling.
 
+    Raises:
+        ValueError: If all probabilities for some angle underflow to zero.
+    """
     dists = angle_to_proximities(angles, sigma)
 
-    cliff_ang = random_state.choice(
-        _CLIFFORD_ANGLES, 1, replace=False, p=np.array(dists) / np.sum(dists)
-    )
-    return cliff_ang
+    # Inverse transform sampling with one uniform sample per angle.
+    cdf = np.cumsum(dists, axis=-1, out=dists)
+    if not np.all(cdf[..., -1] > 0):
+        raise ValueError(
+            "The distribution over Clifford angles vanished for some angles. "
+            "Try a larger `sigma`."
+        )
+    cdf /= cdf[..., -1:]
+    samples = random_state.random_sample(np.shape(angles))
+    indices = np.sum(cdf <= np.expand_dims(samples, -1), axis=-1)
+    return _CLIFFORD_ANGLES[indices]
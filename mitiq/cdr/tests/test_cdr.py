@@ -31,6 +31,7 @@ from mitiq.cdr import (
     linear_fit_function,
     mitigate_executor,
     cdr_decorator,
+    generate_training_circuits,
 )
 
 from mitiq.interface import convert_from_mitiq, convert_to_mitiq
@@ -268,6 +269,40 @@ def test_mitigate_executor_with_variable_noise_cdr(circuit_type):
     assert abs(mitigated - true_value) <= abs(noisy_value - true_value)
 
 
+@pytest.mark.parametrize(
+    "sigmas, expected_kwargs",
+    [
+        ({}, {}),
+        (
+            {"sigma_select": 0.3, "sigma_replace": 0.7},
+            {"sigma_select": 0.3, "sigma_replace": 0.7},
+        ),
+        ({"sigma_select": None, "sigma_replace": 0.7}, {"sigma_replace": 0.7}),
+    ],
+)
+def test_execute_with_cdr_passes_sigmas_to_training_set_generation(
+    monkeypatch, sigmas, expected_kwargs
+):
+    received_kwargs = []
+
+    def spy(*args, **kwargs):
+        received_kwargs.append(kwargs)
+        return generate_training_circuits(*args, **kwargs)
+
+    monkeypatch.setattr("mitiq.cdr.cdr.generate_training_circuits", spy)
+    a, b = LineQubit.range(2)
+    execute_with_cdr(
+        cirq.Circuit(cirq.rz(0.1).on(a), cirq.rz(1.4).on(b), cirq.CNOT(a, b)),
+        execute,
+        observable=Observable(PauliString("ZZ")),
+        simulator=simulate,
+        num_training_circuits=2,
+        random_state=1,
+        **sigmas,
+    )
+    assert received_kwargs == [expected_kwargs]
+
+
 def test_no_num_fit_parameters_with_custom_fit_raises_error():
     with pytest.raises(ValueError, match="Must provide `num_fit_parameters`"):
         execute_with_cdr(
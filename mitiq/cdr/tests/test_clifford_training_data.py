@@ -23,6 +23,7 @@ from cirq.circuits import Circuit
 from mitiq._typing import SUPPORTED_PROGRAM_TYPES
 from mitiq.interface import convert_from_mitiq
 from mitiq.cdr.clifford_training_data import (
+    _get_selection_distribution,
     _select,
     _map_to_near_clifford,
     _replace,
@@ -80,6 +81,20 @@ def test_select_some(method):
     assert len(indices) == n // 2
 
 
+@pytest.mark.parametrize("method", ("uniform", "gaussian"))
+def test_get_selection_distribution(method):
+    q = cirq.LineQubit(0)
+    ops = [cirq.ops.rz(a).on(q) for a in np.linspace(0.1, 1.4, 5)]
+    distribution = _get_selection_distribution(ops, method, sigma=0.5)
+    assert distribution.shape == (len(ops),)
+    assert np.isclose(np.sum(distribution), 1.0)
+
+
+def test_get_selection_distribution_bad_method():
+    with pytest.raises(ValueError, match="Arg `method_select` must be"):
+        _get_selection_distribution([], method="unknown method")
+
+
 def test_select_bad_method():
     with pytest.raises(ValueError, match="Arg `method_select` must be"):
         _select([], fraction_non_clifford=0.0, method="unknown method")
@@ -115,6 +130,80 @@ def test_map_to_near_clifford():
     assert new_ops == expected_ops
 
 
+def test_map_to_near_clifford_with_closest_clifford_cache():
+    q = cirq.LineQubit(0)
+    ops = [cirq.ops.rz(0.1).on(q), cirq.ops.rz(1.4).on(q)]
+    cached_op = cirq.ops.rz(np.pi).on(q)
+    cache = {0: cached_op}
+
+    new_ops = _map_to_near_clifford(
+        ops,
+        fraction_non_clifford=0.0,
+        method_replace="closest",
+        random_state=np.random.RandomState(2),
+        closest_clifford_cache=cache,
+    )
+    assert new_ops == [cached_op, cirq.ops.rz(np.pi / 2).on(q)]
+    assert cache == {0: cached_op, 1: cirq.ops.rz(np.pi / 2).on(q)}
+
+
+def test_map_to_near_clifford_closest_clifford_cache_ties_not_cached():
+    q = cirq.LineQubit(0)
+    ops = [cirq.ops.rz(np.pi / 4).on(q)]
+    cache = {}
+
+    (new_op,) = _map_to_near_clifford(
+        ops, fraction_non_clifford=0.0, closest_clifford_cache=cache
+    )
+    assert new_op in (cirq.ops.rz(0.0).on(q), cirq.ops.rz(np.pi / 2).on(q))
+    assert cache == {}
+
+
+def test_map_to_near_clifford_closest_clifford_cache_bad_method():
+    q = cirq.LineQubit(0)
+    with pytest.raises(ValueError, match="can only be used with"):
+        _map_to_near_clifford(
+            [cirq.ops.rz(0.1).on(q)],
+            fraction_non_clifford=0.0,
+            method_replace="uniform",
+            closest_clifford_cache={},
+        )
+
+
+def test_generate_training_circuits_closest():
+    q = cirq.LineQubit(0)
+    angles = [0.1, 1.4, 2.0, -0.3]
+    circuit = Circuit(cirq.ops.rz(a).on(q) for a in angles)
+    expected = Circuit(
+        cirq.ops.rz(a).on(q) for a in (0.0, np.pi / 2, np.pi / 2, 0.0)
+    )
+
+    training_circuits = generate_training_circuits(
+        circuit,
+        num_training_circuits=3,
+        fraction_non_clifford=0.0,
+        method_replace="closest",
+    )
+    for training_circuit in training_circuits:
+        assert training_circuit == expected
+
+
+def test_generate_training_circuits_closest_skips_unselected_gates():
+    # Gates that are never replaced need not be rotations with an exponent.
+    q = cirq.LineQubit(0)
+    circuit = Circuit(
+        cirq.MatrixGate(cirq.unitary(cirq.T)).on(q), cirq.rz(0.1).on(q)
+    )
+
+    training_circuits = generate_training_circuits(
+        circuit,
+        num_training_circuits=2,
+        fraction_non_clifford=1.0,
+        method_replace="closest",
+    )
+    assert training_circuits == [circuit, circuit]
+
+
 def test_generate_training_circuits_bad_methods():
     with pytest.raises(ValueError):
         generate_training_circuits(
@@ -31,6 +31,7 @@ from mitiq.cdr.clifford_utils import (
     angle_to_proximities,
     probabilistic_angle_to_clifford,
     count_non_cliffords,
+    _split_clifford_angles,
     _CLIFFORD_ANGLES,
 )
 
@@ -76,6 +77,15 @@ def test_is_clifford_angle():
         assert is_clifford_angle(p * np.array(_CLIFFORD_ANGLES)).all()
 
     assert not is_clifford_angle(-0.17)
+    assert is_clifford_angle(2 * np.pi - 10**-7)
+    assert is_clifford_angle(-(10**-7))
+
+
+def test_split_clifford_angles():
+    angles = np.array([np.pi / 8, 5 * np.pi / 8, -np.pi / 8])
+    lower_indices, fractions = _split_clifford_angles(angles)
+    assert np.allclose(lower_indices, [0, 1, 3])
+    assert np.allclose(fractions, [0.25, 0.25, 0.75])
 
 
 def test_closest_clifford():
@@ -85,10 +95,21 @@ def test_closest_clifford():
             assert closest_clifford(a) == ang
 
 
+def test_closest_clifford_equidistant():
+    angles = np.pi / 4 + np.arange(4) * np.pi / 2
+    for _ in range(10):
+        clifford_angles = closest_clifford(angles)
+        assert clifford_angles.shape == angles.shape
+        assert set(clifford_angles).issubset(_CLIFFORD_ANGLES)
+        diffs = np.mod(clifford_angles - angles + np.pi, 2 * np.pi) - np.pi
+        assert np.allclose(np.abs(diffs), np.pi / 4)
+
+
 def test_random_clifford():
     assert set(random_clifford(20, np.random.RandomState(1))).issubset(
         _CLIFFORD_ANGLES
     )
+    assert random_clifford(0, np.random.RandomState(1)).shape == (0,)
 
 
 def test_angle_to_proximities():
@@ -98,6 +119,24 @@ def test_angle_to_proximities():
             assert (isinstance(p, float) for p in probabilities)
 
 
+def test_angle_to_proximities_matches_frobenius_distance():
+    s_matrix = cirq.unitary(cirq.S)
+    angles = np.linspace(-np.pi, 3 * np.pi, 17)
+    sigma = 0.7
+    proximities = angle_to_proximities(angles, sigma)
+    assert proximities.shape == (len(angles), 4)
+
+    for angle, proximity in zip(angles, proximities):
+        rz_matrix = cirq.unitary(cirq.rz(angle % (2 * np.pi)))
+        diffs = np.array(
+            [
+                np.linalg.norm(rz_matrix - np.linalg.matrix_power(s_matrix, k))
+                for k in range(4)
+            ]
+        )
+        assert np.allclose(proximity, np.exp(-((diffs / sigma) ** 2)))
+
+
 def test_angle_to_proximity():
     for sigma in np.linspace(0.1, 2, 10):
         probabilities = angle_to_proximity(_CLIFFORD_ANGLES, sigma)
@@ -110,3 +149,10 @@ def test_probabilistic_angles_to_clifford():
             _CLIFFORD_ANGLES, sigma, np.random.RandomState(1)
         )
         assert all(a in _CLIFFORD_ANGLES for a in angles)
+
+
+def test_probabilistic_angles_to_clifford_vanishing_distribution():
+    with pytest.raises(ValueError, match="Try a larger `sigma`"):
+        probabilistic_angle_to_clifford(
+            np.pi / 4, 0.01, np.random.RandomState(1)
+        )